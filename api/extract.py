@@ -10,13 +10,80 @@ from http.server import BaseHTTPRequestHandler
 import json
 import fitz  # PyMuPDF
 import base64
+import hashlib
 import re
-import cgi
 import io
-from typing import Dict, List, Any
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesHeaderParser
+from itertools import repeat
+from operator import attrgetter
+from typing import Dict, List, Any, NamedTuple
+from urllib.parse import urlparse, parse_qs
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
 
-def cluster_text(spans: List[Dict], threshold: int = 5) -> List[Dict]:
+
+# Construction marker patterns, folded into non-overlapping branches behind a
+# shared leading capital so non-markers fail on the first character:
+#   BP1, SC2, RW3a   [A-Z]{1,4}\d{1,3}[a-z]?  (also covers SC/BP/RW/FB/C/B/W + digits)
+#   C3A              [A-Z]\d{1,3}[A-Z]
+#   C-1, B-12        [A-Z]{1,2}-\d{1,3}
+_MARKER_RE = re.compile(r'[A-Z](?:[A-Z]{0,3}\d{1,3}[a-z]?|\d{1,3}[A-Z]|[A-Z]?-\d{1,3})')
+
+# Title block fields, compiled once at import
+_TITLE_PATTERNS = {
+    'drawing_number': re.compile(r'(?:DWG|DRAWING)[\s.:]*([A-Z0-9-]+)', re.IGNORECASE),
+    'revision': re.compile(r'(?:REV|REVISION)[\s.:]*([A-Z0-9]+)', re.IGNORECASE),
+    'scale': re.compile(r'(?:SCALE)[\s.:]*(\d+:\d+|\d+\/\d+)', re.IGNORECASE),
+    'date': re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', re.IGNORECASE),
+    'sheet': re.compile(r'(?:SHEET|SHT)[\s.:]*(\d+)\s*(?:OF|/)\s*(\d+)', re.IGNORECASE),
+}
+
+
+class Span(NamedTuple):
+    """A run of text on a page, either as extracted or after clustering."""
+    text: str
+    x: float
+    y: float
+    bbox: tuple
+    font: str = ''
+    size: float = 0
+
+
+def _cluster_starts(spans: List[Span], threshold: int) -> List[int]:
+    """
+    Return the index of the first span of each cluster in sorted spans.
+    A span joins the current cluster when it is on the cluster's line and
+    starts within threshold of the cluster's estimated text end.
+    """
+    starts = [0]
+    cur_x = spans[0].x
+    cur_y = spans[0].y
+    cur_len = len(spans[0].text)
+    
+    for i in range(1, len(spans)):
+        span = spans[i]
+        same_line = abs(span.y - cur_y) < 2
+        close_horizontally = (span.x - (cur_x + cur_len * 2)) < threshold
+        
+        if same_line and close_horizontally:
+            cur_len += len(span.text)
+        else:
+            starts.append(i)
+            cur_x = span.x
+            cur_y = span.y
+            cur_len = len(span.text)
+    
+    return starts
+
+
+def cluster_text(spans: List[Span], threshold: int = 5) -> List[Span]:
     """
     Merges fragmented vector text based on proximity.
     CAD software often splits text into individual characters - this fixes that.
@@ -24,50 +91,188 @@ def cluster_text(spans: List[Dict], threshold: int = 5) -> List[Dict]:
     if not spans:
         return []
     
-    spans.sort(key=lambda s: (s['y'], s['x']))
-    
-    clusters = []
-    if not spans:
-        return clusters
+    spans.sort(key=attrgetter('y', 'x'))
     
-    current = spans[0].copy()
+    starts = _cluster_starts(spans, threshold)
+    starts.append(len(spans))
     
-    for next_span in spans[1:]:
-        same_line = abs(next_span['y'] - current['y']) < 2
-        close_horizontally = (next_span['x'] - (current['x'] + len(current['text']) * 2)) < threshold
+    clusters = []
+    for start, end in zip(starts, starts[1:]):
+        group = spans[start:end]
+        head = group[0]
         
-        if same_line and close_horizontally:
-            current['text'] += next_span['text']
-            current['bbox'] = (
-                current['bbox'][0],
-                current['bbox'][1],
-                next_span['bbox'][2],
-                max(current['bbox'][3], next_span['bbox'][3])
-            )
-        else:
-            if current['text'].strip():
-                clusters.append(current)
-            current = next_span.copy()
-    
-    if current['text'].strip():
-        clusters.append(current)
+        if end - start == 1:
+            if head.text.strip():
+                clusters.append(head)
+            continue
+        
+        text = ''.join([s.text for s in group])
+        if not text.strip():
+            continue
+        
+        bbox = (
+            head.bbox[0],
+            head.bbox[1],
+            group[-1].bbox[2],
+            max(s.bbox[3] for s in group)
+        )
+        clusters.append(Span(text, head.x, head.y, bbox, head.font, head.size))
     
     return clusters
 
 
 def is_construction_marker(text: str) -> bool:
     """Identifies construction markers like BP1, C1, RW2, SC1, etc."""
-    patterns = [
-        r'^[A-Z]{1,4}\d{1,3}[a-z]?$',
-        r'^[A-Z]{1,2}-\d{1,3}$',
-        r'^[A-Z]\d{1,3}[A-Z]?$',
-        r'^(SC|BP|RW|FB|C|B|W)\d{1,3}$',
+    text = text.strip()
+    # Markers are 2-8 characters starting with a capital; most drawing text
+    # (notes, dimensions) is rejected here without entering the regex
+    if not 2 <= len(text) <= 8 or not 'A' <= text[0] <= 'Z':
+        return False
+    return _MARKER_RE.fullmatch(text) is not None
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+# Per-process document used by pool workers (see _init_worker)
+_worker_doc = None
+
+# Recent response bodies keyed by (sha256 of the PDF, want_style). A warm
+# container often sees the same drawing uploaded again for a different
+# question. The encoded JSON is cached rather than the result dicts: it is
+# several times smaller, is never mutated by the handler and is sent as-is
+# on a hit. The cache is bounded by total body size, since one large
+# drawing can encode to tens of MB.
+# Open Documents are not cached as well: opening one costs well under a
+# millisecond (MuPDF's font and CMap store is process-wide and stays warm),
+# and repeat uploads are already answered from here.
+_RESULT_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_RESULT_CACHE_BYTES = 64 * 1024 * 1024
+_result_cache_size = 0
+
+
+def _build_spans(blocks: List[Dict], _round=round, _Span=Span, _intern=sys.intern) -> List[Span]:
+    """
+    Flatten get_text("dict") blocks into non-empty Spans.
+    Builtins are bound as defaults so the comprehension only does local lookups.
+    Font names are interned: a drawing uses a handful of fonts, but PyMuPDF
+    returns a fresh string for every span.
+    """
+    return [
+        _Span(text, _round(span["bbox"][0], 2), _round(span["bbox"][1], 2), span["bbox"],
+              _intern(span["font"]), span["size"])
+        for block in blocks if "lines" in block
+        for line in block["lines"]
+        for span in line["spans"]
+        if (text := span["text"].strip())
     ]
-    return any(re.match(p, text.strip()) for p in patterns)
 
 
-def extract_drawing_elements(pdf_bytes: bytes) -> Dict[str, Any]:
-    """Extract all text elements, markers, and drawing metadata from PDF."""
+def _word_spans(words: List[tuple], _round=round, _Span=Span) -> List[Span]:
+    """Convert get_text("words") tuples (x0, y0, x1, y1, word, ...) into Spans."""
+    return [_Span(w[4], _round(w[0], 2), _round(w[1], 2), w[:4]) for w in words]
+
+
+def _extract_page(page, page_num: int, want_style: bool = True) -> tuple:
+    """
+    Extract text elements and markers from a single page.
+    Returns (page_data, page_markers, page_text); page_data["elements"]
+    holds the page's text elements in reading order, page_markers maps
+    each marker to its indices in that list and page_text is the elements'
+    text joined with spaces, for the title block search.
+    
+    With want_style=False, text comes from the flat "words" output instead
+    of the nested "dict" output: much cheaper, but elements carry no font
+    or size and are split at whitespace.
+    """
+    page_data = {
+        "page": page_num + 1,
+        "width": round(page.rect.width, 2),
+        "height": round(page.rect.height, 2),
+        "rotation": page.rotation,
+        "elements": []
+    }
+    page_markers = {}
+    texts = []
+    
+    if want_style:
+        blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
+        clean_elements = cluster_text(_build_spans(blocks))
+    else:
+        # MuPDF has already joined the characters into words; merging them
+        # again would glue neighbouring words together
+        clean_elements = sorted(_word_spans(page.get_text("words")), key=attrgetter('y', 'x'))
+    
+    # One slot per element up front; clustering already fixed the count
+    elements = page_data["elements"] = [None] * len(clean_elements)
+    
+    # Spans carry rounded x/y because sorting and clustering compare them;
+    # bbox and size are rounded here, once per element rather than once per
+    # raw span (CAD text often has one span per character)
+    for i, el in enumerate(clean_elements):
+        text = el.text
+        bbox = (el.x, el.y, round(el.bbox[2], 2), round(el.bbox[3], 2))
+        
+        element_data = {
+            'text': text,
+            'x': el.x,
+            'y': el.y,
+            'bbox': bbox,
+            'font': el.font,
+            'size': round(el.size, 1),
+            'page': page_num + 1
+        }
+        
+        if is_construction_marker(text):
+            element_data['type'] = 'marker'
+            if text not in page_markers:
+                page_markers[text] = []
+            page_markers[text].append(i)
+        else:
+            element_data['type'] = 'text'
+        
+        elements[i] = element_data
+        texts.append(text)
+    
+    # Only the path count is reported, so skip get_drawings()'s conversion of
+    # every path item into Point/Rect objects
+    drawings = page.get_cdrawings()
+    page_data["vector_count"] = len(drawings)
+    page_data["has_drawings"] = len(drawings) > 0
+    
+    images = page.get_images(full=False)
+    page_data["image_count"] = len(images)
+    
+    return page_data, page_markers, ' '.join(texts)
+
+
+def _init_worker(pdf_bytes: bytes) -> None:
+    """Open the PDF once per pool worker. Documents are never shared across processes."""
+    global _worker_doc
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def _process_page(page_num: int, want_style: bool) -> tuple:
+    """Pool task: extract one page from the worker's own document."""
+    return _extract_page(_worker_doc[page_num], page_num, want_style)
+
+
+def extract_drawing_elements(pdf_bytes: bytes, num_workers: int = 1,
+                             want_style: bool = True) -> Dict[str, Any]:
+    """
+    Extract all text elements, markers, and drawing metadata from PDF.
+    
+    Pages are independent, so with num_workers > 1 (and more than one CPU)
+    they are fanned out to a process pool. The default of 1 keeps everything
+    in-process, which is what the Vercel runtime wants. Threads are not an
+    option: PyMuPDF holds the GIL and is not thread-safe.
+    
+    want_style=False skips font/size extraction for a faster word-level pass.
+    """
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     
     results = {
@@ -80,109 +285,127 @@ def extract_drawing_elements(pdf_bytes: bytes) -> Dict[str, Any]:
         "drawing_info": {}
     }
     
-    for page_num, page in enumerate(doc):
-        page_data = {
-            "page": page_num + 1,
-            "width": round(page.rect.width, 2),
-            "height": round(page.rect.height, 2),
-            "rotation": page.rotation,
-            "elements": []
-        }
-        results["metadata"].append({
-            "page": page_num + 1,
-            "width": page.rect.width,
-            "height": page.rect.height,
-            "rotation": page.rotation
-        })
-        
-        raw_spans = []
-        blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
-        
-        for block in blocks:
-            if "lines" not in block:
-                continue
-                
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span["text"].strip()
-                    if not text:
-                        continue
-                    
-                    raw_spans.append({
-                        'text': text,
-                        'x': round(span["bbox"][0], 2),
-                        'y': round(span["bbox"][1], 2),
-                        'bbox': tuple(round(v, 2) for v in span["bbox"]),
-                        'font': span.get("font", ""),
-                        'size': round(span.get("size", 0), 1),
-                        'color': span.get("color", 0),
-                        'flags': span.get("flags", 0)
-                    })
-        
-        clean_elements = cluster_text(raw_spans)
-        
-        for el in clean_elements:
-            text = el['text']
-            
-            element_data = {
-                'text': text,
-                'x': el['x'],
-                'y': el['y'],
-                'bbox': el['bbox'],
-                'font': el.get('font', ''),
-                'size': el.get('size', 0),
-                'page': page_num + 1
-            }
-            
-            if is_construction_marker(text):
-                element_data['type'] = 'marker'
-                if text not in results["markers"]:
-                    results["markers"][text] = []
-                results["markers"][text].append({
-                    'x': el['x'],
-                    'y': el['y'],
-                    'bbox': el['bbox'],
-                    'page': page_num + 1
-                })
-            else:
-                element_data['type'] = 'text'
-            
-            page_data["elements"].append(element_data)
-            results["all_text_elements"].append(element_data)
-        
-        drawings = page.get_drawings()
-        page_data["vector_count"] = len(drawings)
-        page_data["has_drawings"] = len(drawings) > 0
-        
-        images = page.get_images()
-        page_data["image_count"] = len(images)
-        
+    workers = min(num_workers, os.cpu_count() or 1, doc.page_count)
+    
+    if workers > 1:
+        n_pages = doc.page_count
+        doc.close()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(pdf_bytes,)) as ex:
+            page_results = list(ex.map(_process_page, range(n_pages), repeat(want_style)))
+    else:
+        page_results = [_extract_page(page, page_num, want_style) for page_num, page in enumerate(doc)]
+        doc.close()
+    
+    # Markers reference their occurrences by index into all_text_elements
+    page_texts = []
+    for page_data, page_markers, page_text in page_results:
+        offset = len(results["all_text_elements"])
         results["pages"].append(page_data)
+        results["all_text_elements"].extend(page_data["elements"])
+        for text, indices in page_markers.items():
+            results["markers"].setdefault(text, []).extend(offset + i for i in indices)
+        if page_text:
+            page_texts.append(page_text)
+    
+    # Page metadata is the page records without their contents
+    results["metadata"] = [
+        {"page": p["page"], "width": p["width"], "height": p["height"], "rotation": p["rotation"]}
+        for p in results["pages"]
+    ]
     
-    extract_title_block_info(results)
+    extract_title_block_info(results, ' '.join(page_texts))
     
-    doc.close()
     return results
 
 
-def extract_title_block_info(results: Dict) -> None:
-    """Extract common title block information from the drawing."""
-    title_patterns = {
-        'drawing_number': r'(?:DWG|DRAWING)[\s.:]*([A-Z0-9-]+)',
-        'revision': r'(?:REV|REVISION)[\s.:]*([A-Z0-9]+)',
-        'scale': r'(?:SCALE)[\s.:]*(\d+:\d+|\d+\/\d+)',
-        'date': r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        'sheet': r'(?:SHEET|SHT)[\s.:]*(\d+)\s*(?:OF|/)\s*(\d+)',
-    }
-    
-    all_text = ' '.join([el['text'] for el in results.get('all_text_elements', [])])
+def extract_title_block_info(results: Dict, all_text: str = None) -> None:
+    """
+    Extract common title block information from the drawing.
+    all_text is every element's text joined with spaces; it is built from
+    results['all_text_elements'] when not supplied.
+    """
+    if all_text is None:
+        all_text = ' '.join([el['text'] for el in results.get('all_text_elements', [])])
     
-    for key, pattern in title_patterns.items():
-        match = re.search(pattern, all_text, re.IGNORECASE)
+    # One search per field is deliberate: each pattern keeps re's prefix scan,
+    # which makes five searches faster than a single combined alternation
+    for key, pattern in _TITLE_PATTERNS.items():
+        match = pattern.search(all_text)
         if match:
             results['drawing_info'][key] = match.group(1) if match.lastindex == 1 else match.groups()
 
 
+def add_summary(results: Dict[str, Any]) -> None:
+    """Add summary statistics to an extraction result."""
+    results['summary'] = {
+        'total_pages': len(results['metadata']),
+        'total_markers': len(results['markers']),
+        'total_text_elements': len(results['all_text_elements']),
+        'marker_types': list(results['markers'].keys())
+    }
+
+
+def extract_response_body_cached(pdf_bytes: bytes, want_style: bool = True) -> bytes:
+    """
+    Return the encoded JSON response (results plus summary) for a PDF,
+    from a size-bounded LRU cache keyed by the PDF's SHA-256.
+    """
+    global _result_cache_size
+    key = (hashlib.sha256(pdf_bytes).digest(), want_style)
+    
+    body = _RESULT_CACHE.get(key)
+    if body is not None:
+        _RESULT_CACHE.move_to_end(key)
+        return body
+    
+    results = extract_drawing_elements(pdf_bytes, want_style=want_style)
+    add_summary(results)
+    body = dumps_json(results)
+    del results
+    
+    if len(body) <= _RESULT_CACHE_BYTES:
+        _RESULT_CACHE[key] = body
+        _result_cache_size += len(body)
+        while _result_cache_size > _RESULT_CACHE_BYTES:
+            _, evicted = _RESULT_CACHE.popitem(last=False)
+            _result_cache_size -= len(evicted)
+    return body
+
+
+def parse_multipart(body: bytes, boundary: str) -> Dict[str, tuple]:
+    """
+    Locate the parts of a multipart/form-data body.
+    Returns {field name: (filename, start, end)} with payload offsets into body,
+    so the caller copies out only the part it uses. The first part wins when
+    a field name repeats.
+    """
+    delimiter = b'--' + boundary.encode('latin-1')
+    header_parser = BytesHeaderParser()
+    parts = {}
+    
+    pos = body.find(delimiter)
+    while pos != -1:
+        start = pos + len(delimiter)
+        if body[start:start + 2] == b'--':
+            break  # closing delimiter
+        
+        header_end = body.find(b'\r\n\r\n', start)
+        if header_end == -1:
+            break
+        next_pos = body.find(b'\r\n' + delimiter, header_end)
+        if next_pos == -1:
+            break
+        
+        headers = header_parser.parsebytes(body[start:header_end + 4].lstrip())
+        name = headers.get_param('name', header='content-disposition')
+        if name is not None and name not in parts:
+            parts[name] = (headers.get_filename(), header_end + 4, next_pos)
+        pos = next_pos + 2
+    
+    return parts
+
+
 class handler(BaseHTTPRequestHandler):
     """Vercel Serverless Function Handler"""
     
@@ -201,20 +424,22 @@ class handler(BaseHTTPRequestHandler):
             content_type = self.headers.get('Content-Type', '')
             content_length = int(self.headers.get('Content-Length', 0))
             
+            # ?style=false skips font/size extraction for a faster word-level pass
+            query = parse_qs(urlparse(self.path).query)
+            want_style = query.get('style', ['true'])[0].lower() not in ('0', 'false', 'no')
+            
             pdf_bytes = None
             
             # Handle multipart form data (file upload)
             if 'multipart/form-data' in content_type:
+                boundary = self.headers.get_param('boundary')
+                if not boundary:
+                    self.send_error_response(400, 'Missing boundary in multipart/form-data Content-Type')
+                    return
+                
                 # Parse the multipart form data
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={
-                        'REQUEST_METHOD': 'POST',
-                        'CONTENT_TYPE': content_type,
-                        'CONTENT_LENGTH': content_length,
-                    }
-                )
+                body = self.rfile.read(content_length)
+                form = parse_multipart(body, boundary)
                 
                 # Look for file field (try common names)
                 file_field = None
@@ -225,13 +450,15 @@ class handler(BaseHTTPRequestHandler):
                 
                 # Also check all fields for a file
                 if file_field is None:
-                    for key in form.keys():
-                        if form[key].filename:
-                            file_field = form[key]
+                    for field in form.values():
+                        if field[0]:
+                            file_field = field
                             break
                 
-                if file_field and file_field.file:
-                    pdf_bytes = file_field.file.read()
+                if file_field:
+                    _, start, end = file_field
+                    pdf_bytes = body[start:end]
+                    del body
                 else:
                     self.send_error_response(400, 'No file found in form data. Send file with field name: file, pdf, or document')
                     return
@@ -240,18 +467,23 @@ class handler(BaseHTTPRequestHandler):
             elif 'application/json' in content_type or content_type == '':
                 body = self.rfile.read(content_length)
                 data = json.loads(body.decode('utf-8'))
+                del body
                 
                 if 'pdf_base64' not in data:
                     self.send_error_response(400, 'Missing required field: pdf_base64')
                     return
                 
                 try:
-                    pdf_bytes = base64.b64decode(data['pdf_base64'])
+                    pdf_bytes = base64.b64decode(data.pop('pdf_base64'))
                 except Exception as e:
                     self.send_error_response(400, f'Invalid base64 encoding: {str(e)}')
                     return
+                
+                # Release the request body and base64 text before extraction
+                # so only the decoded PDF stays alive
+                del data
             
-            # Handle raw binary PDF
+            # Handle raw binary PDF (recommended: no base64 inflation or decode)
             elif 'application/pdf' in content_type:
                 pdf_bytes = self.rfile.read(content_length)
             
@@ -260,30 +492,24 @@ class handler(BaseHTTPRequestHandler):
                 pdf_bytes = self.rfile.read(content_length)
             
             else:
-                self.send_error_response(400, f'Unsupported Content-Type: {content_type}. Use application/json, multipart/form-data, or application/pdf')
+                self.send_error_response(400, f'Unsupported Content-Type: {content_type}. Use application/pdf, multipart/form-data, or application/json')
                 return
             
             if not pdf_bytes or len(pdf_bytes) == 0:
                 self.send_error_response(400, 'Empty PDF data received')
                 return
             
-            # Extract data from PDF
-            results = extract_drawing_elements(pdf_bytes)
+            # Extract data from PDF; the body includes the summary statistics
+            body = extract_response_body_cached(pdf_bytes, want_style=want_style)
             
-            # Add summary statistics
-            results['summary'] = {
-                'total_pages': len(results['metadata']),
-                'total_markers': len(results['markers']),
-                'total_text_elements': len(results['all_text_elements']),
-                'marker_types': list(results['markers'].keys())
-            }
-            
-            # Send response
+            # Send response as one compact write; wfile is unbuffered, so
+            # json.dump straight into it would issue thousands of tiny writes
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps(results, indent=2).encode('utf-8'))
+            self.wfile.write(body)
             
         except json.JSONDecodeError as e:
             self.send_error_response(400, f'Invalid JSON: {str(e)}')
@@ -307,14 +533,14 @@ class handler(BaseHTTPRequestHandler):
         
         info = {
             "api": "PDF Drawing Extraction API",
-            "version": "1.1.0",
+            "version": "1.2.0",
             "endpoints": {
                 "POST /api/extract": {
                     "description": "Extract text and markers from PDF drawings",
                     "content_types": [
-                        "application/json (with pdf_base64 field)",
+                        "application/pdf (raw binary, recommended)",
                         "multipart/form-data (file upload)",
-                        "application/pdf (raw binary)"
+                        "application/json (with pdf_base64 field)"
                     ],
                     "json_body": {
                         "pdf_base64": "Base64 encoded PDF file"
@@ -322,9 +548,12 @@ class handler(BaseHTTPRequestHandler):
                     "form_data": {
                         "file": "PDF file upload (or: pdf, document, data)"
                     },
+                    "query": {
+                        "style": "Set to false to skip font/size extraction (faster, word-level elements)"
+                    },
                     "response": {
                         "metadata": "Page dimensions and info",
-                        "markers": "Construction markers found (BP1, SC2, etc.)",
+                        "markers": "Construction markers found (BP1, SC2, etc.), each mapped to its indices in all_text_elements",
                         "all_text_elements": "All text with positions",
                         "drawing_info": "Extracted title block info",
                         "summary": "Statistics about the extraction"
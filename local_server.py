@@ -5,96 +5,176 @@ Run this for local testing:
     python local_server.py
 
 Then test with:
+    curl -X POST http://localhost:5000/extract \
+         -H "Content-Type: application/pdf" \
+         --data-binary @drawing.pdf
+
+or, with base64 JSON:
     curl -X POST http://localhost:5000/extract \
          -H "Content-Type: application/json" \
          -d '{"pdf_base64": "..."}'
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import fitz  # PyMuPDF
 import base64
+import json
+import os
 import re
-from typing import Dict, List, Any
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
+from operator import attrgetter
+from typing import Dict, Iterator, List, Any, NamedTuple
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
 
 app = Flask(__name__)
 
+# Pages per request are spread over this many processes. PyMuPDF is not
+# thread-safe, so each worker opens its own copy of the document. Set
+# EXTRACT_WORKERS=1 when a process manager (gunicorn -w N) already runs one
+# server process per CPU.
+NUM_WORKERS = int(os.environ.get('EXTRACT_WORKERS', min(os.cpu_count() or 1, 4)))
+
+_worker_doc = None
+
+# Construction marker patterns, folded into one alternation behind a shared
+# leading capital:
+#   BP1, SC2, RW3a   [A-Z]{1,4}\d{1,3}[a-z]?  (also covers SC/BP/RW/FB/C/B/W + digits)
+#   C3A              [A-Z]\d{1,3}[A-Z]
+#   C-1, B-12        [A-Z]{1,2}-\d{1,3}
+_MARKER_RE = re.compile(r'[A-Z](?:[A-Z]{0,3}\d{1,3}[a-z]?|\d{1,3}[A-Z]|[A-Z]?-\d{1,3})')
+
+# Title block fields, compiled once at import
+_TITLE_PATTERNS = {
+    'drawing_number': re.compile(r'(?:DWG|DRAWING)[\s.:]*([A-Z0-9-]+)', re.IGNORECASE),
+    'revision': re.compile(r'(?:REV|REVISION)[\s.:]*([A-Z0-9]+)', re.IGNORECASE),
+    'scale': re.compile(r'(?:SCALE)[\s.:]*(\d+:\d+|\d+\/\d+)', re.IGNORECASE),
+    'date': re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', re.IGNORECASE),
+}
+
+
+class Span(NamedTuple):
+    """A run of text on a page, either as extracted or after clustering."""
+    text: str
+    x: float
+    y: float
+    bbox: tuple
+    font: str = ''
+    size: float = 0
+
+
+def _close_cluster(clusters: List[Span], head: Span, frags: List[str], bbox: List[float]) -> None:
+    """Append a finished cluster unless its text is blank."""
+    if len(frags) == 1:
+        if head.text.strip():
+            clusters.append(head)
+        return
+    text = ''.join(frags)
+    if text.strip():
+        clusters.append(head._replace(text=text, bbox=tuple(bbox)))
 
-def cluster_text(spans: List[Dict], threshold: int = 5) -> List[Dict]:
+
+def cluster_text(spans: List[Span], threshold: int = 5) -> List[Span]:
     """Merges fragmented vector text based on proximity."""
     if not spans:
         return []
     
-    spans.sort(key=lambda s: (s['y'], s['x']))
+    spans.sort(key=attrgetter('y', 'x'))
     clusters = []
     
     if not spans:
         return clusters
     
-    current = spans[0].copy()
+    head = spans[0]
+    # The current cluster lives in locals: its anchor for the boundary test,
+    # its text fragments (joined once when it closes) and bbox. Spans that
+    # merge with nothing are passed through as-is; only merged clusters get
+    # a new Span.
+    cur_x = head.x
+    cur_y = head.y
+    cur_len = len(head.text)
+    cur_frags = [head.text]
+    cur_bbox = list(head.bbox)
     
     for next_span in spans[1:]:
-        same_line = abs(next_span['y'] - current['y']) < 2
-        close_horizontally = (next_span['x'] - (current['x'] + len(current['text']) * 2)) < threshold
+        same_line = abs(next_span.y - cur_y) < 2
+        close_horizontally = (next_span.x - (cur_x + cur_len * 2)) < threshold
         
         if same_line and close_horizontally:
-            current['text'] += next_span['text']
-            current['bbox'] = (
-                current['bbox'][0],
-                current['bbox'][1],
-                next_span['bbox'][2],
-                max(current['bbox'][3], next_span['bbox'][3])
-            )
+            cur_frags.append(next_span.text)
+            cur_len += len(next_span.text)
+            cur_bbox[2] = next_span.bbox[2]
+            cur_bbox[3] = max(cur_bbox[3], next_span.bbox[3])
         else:
-            if current['text'].strip():
-                clusters.append(current)
-            current = next_span.copy()
+            _close_cluster(clusters, head, cur_frags, cur_bbox)
+            head = next_span
+            cur_x = head.x
+            cur_y = head.y
+            cur_len = len(head.text)
+            cur_frags = [head.text]
+            cur_bbox = list(head.bbox)
     
-    if current['text'].strip():
-        clusters.append(current)
+    _close_cluster(clusters, head, cur_frags, cur_bbox)
     
     return clusters
 
 
+# Drawings repeat the same labels (every SC1 callout, every "TYP."), so
+# classify each distinct string once per process
+@lru_cache(maxsize=8192)
 def is_construction_marker(text: str) -> bool:
     """Identifies construction markers like BP1, C1, RW2, SC1, etc."""
-    patterns = [
-        r'^[A-Z]{1,4}\d{1,3}[a-z]?$',
-        r'^[A-Z]{1,2}-\d{1,3}$',
-        r'^[A-Z]\d{1,3}[A-Z]?$',
-        r'^(SC|BP|RW|FB|C|B|W)\d{1,3}$',
-    ]
-    return any(re.match(p, text.strip()) for p in patterns)
+    text = text.strip()
+    # Markers are 2-8 characters starting with a capital; most drawing text
+    # (notes, dimensions) is rejected here without entering the regex
+    if not 2 <= len(text) <= 8 or not 'A' <= text[0] <= 'Z':
+        return False
+    return _MARKER_RE.fullmatch(text) is not None
 
 
-def extract_drawing_elements(pdf_bytes: bytes) -> Dict[str, Any]:
-    """Extract all text elements, markers, and drawing metadata from PDF."""
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+def dumps_json(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(obj: Any) -> Response:
+    """Return obj as a JSON response."""
+    return Response(dumps_json(obj), mimetype='application/json')
+
+
+def _extract_page(page, page_num: int, want_style: bool = True) -> tuple:
+    """
+    Extract text elements and markers from a single page.
+    Returns (page_data, page_markers, page_text); page_markers
+    maps each marker to its indices in page_data["elements"] and page_text
+    is the elements' text joined with spaces.
     
-    results = {
-        "metadata": [],
-        "pages": [],
-        "markers": {},
-        "all_text_elements": [],
-        "drawing_info": {}
+    With want_style=False, text comes from the flat "words" output instead
+    of the nested "dict" output: much cheaper, but elements carry no font
+    or size and are split at whitespace.
+    """
+    page_data = {
+        "page": page_num + 1,
+        "width": round(page.rect.width, 2),
+        "height": round(page.rect.height, 2),
+        "rotation": page.rotation,
+        "elements": []
     }
+    page_markers = {}
+    texts = []
     
-    for page_num, page in enumerate(doc):
-        page_data = {
-            "page": page_num + 1,
-            "width": round(page.rect.width, 2),
-            "height": round(page.rect.height, 2),
-            "rotation": page.rotation,
-            "elements": []
-        }
-        
-        results["metadata"].append({
-            "page": page_num + 1,
-            "width": page.rect.width,
-            "height": page.rect.height,
-            "rotation": page.rotation
-        })
-        
-        raw_spans = []
+    raw_spans = []
+    
+    if want_style:
         blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
         
         for block in blocks:
@@ -107,91 +187,256 @@ def extract_drawing_elements(pdf_bytes: bytes) -> Dict[str, Any]:
                     if not text:
                         continue
                     
-                    raw_spans.append({
-                        'text': text,
-                        'x': round(span["bbox"][0], 2),
-                        'y': round(span["bbox"][1], 2),
-                        'bbox': tuple(round(v, 2) for v in span["bbox"]),
-                        'font': span.get("font", ""),
-                        'size': round(span.get("size", 0), 1),
-                    })
+                    bbox = span["bbox"]
+                    raw_spans.append(Span(
+                        text,
+                        round(bbox[0], 2),
+                        round(bbox[1], 2),
+                        bbox,
+                        # A drawing uses a handful of fonts, but PyMuPDF
+                        # returns a fresh string for every span
+                        sys.intern(span.get("font", "")),
+                        span.get("size", 0),
+                    ))
         
         clean_elements = cluster_text(raw_spans)
+    else:
+        # (x0, y0, x1, y1, word, block_no, line_no, word_no) tuples
+        for w in page.get_text("words"):
+            raw_spans.append(Span(w[4], round(w[0], 2), round(w[1], 2), w[:4]))
         
-        for el in clean_elements:
-            text = el['text']
-            
-            element_data = {
-                'text': text,
-                'x': el['x'],
-                'y': el['y'],
-                'bbox': el['bbox'],
-                'font': el.get('font', ''),
-                'size': el.get('size', 0),
-                'page': page_num + 1
-            }
-            
-            if is_construction_marker(text):
-                element_data['type'] = 'marker'
-                if text not in results["markers"]:
-                    results["markers"][text] = []
-                results["markers"][text].append({
-                    'x': el['x'],
-                    'y': el['y'],
-                    'bbox': el['bbox'],
-                    'page': page_num + 1
-                })
-            else:
-                element_data['type'] = 'text'
-            
-            page_data["elements"].append(element_data)
-            results["all_text_elements"].append(element_data)
+        # MuPDF has already joined the characters into words; merging them
+        # again would glue neighbouring words together
+        clean_elements = sorted(raw_spans, key=attrgetter('y', 'x'))
+    
+    # One slot per element up front; clustering already fixed the count
+    elements = page_data["elements"] = [None] * len(clean_elements)
+    
+    # Spans carry rounded x/y because sorting and clustering compare them;
+    # bbox and size are rounded here, once per element rather than once per
+    # raw span (CAD text often has one span per character)
+    for i, el in enumerate(clean_elements):
+        text = el.text
         
-        drawings = page.get_drawings()
-        page_data["vector_count"] = len(drawings)
-        page_data["has_drawings"] = len(drawings) > 0
+        element_data = {
+            'text': text,
+            'x': el.x,
+            'y': el.y,
+            'bbox': (el.x, el.y, round(el.bbox[2], 2), round(el.bbox[3], 2)),
+            'font': el.font,
+            'size': round(el.size, 1),
+            'page': page_num + 1
+        }
         
-        images = page.get_images()
-        page_data["image_count"] = len(images)
+        if is_construction_marker(text):
+            element_data['type'] = 'marker'
+            page_markers.setdefault(text, []).append(i)
+        else:
+            element_data['type'] = 'text'
         
-        results["pages"].append(page_data)
+        elements[i] = element_data
+        texts.append(text)
     
-    # Extract title block info
-    title_patterns = {
-        'drawing_number': r'(?:DWG|DRAWING)[\s.:]*([A-Z0-9-]+)',
-        'revision': r'(?:REV|REVISION)[\s.:]*([A-Z0-9]+)',
-        'scale': r'(?:SCALE)[\s.:]*(\d+:\d+|\d+\/\d+)',
-        'date': r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-    }
+    # Only the path count is reported, so skip get_drawings()'s conversion of
+    # every path item into Point/Rect objects
+    drawings = page.get_cdrawings()
+    page_data["vector_count"] = len(drawings)
+    page_data["has_drawings"] = len(drawings) > 0
     
-    all_text = ' '.join([el['text'] for el in results.get('all_text_elements', [])])
+    images = page.get_images(full=False)
+    page_data["image_count"] = len(images)
     
-    for key, pattern in title_patterns.items():
-        match = re.search(pattern, all_text, re.IGNORECASE)
+    return page_data, page_markers, ' '.join(texts)
+
+
+def _init_worker(pdf_bytes: bytes) -> None:
+    """Open the PDF once per pool worker."""
+    global _worker_doc
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def _process_page(page_num: int, want_style: bool) -> tuple:
+    """Pool task: extract one page from the worker's own document."""
+    return _extract_page(_worker_doc[page_num], page_num, want_style)
+
+
+def _iter_pages(pdf_bytes: bytes, num_workers: int, want_style: bool):
+    """
+    Yield _extract_page results in page order.
+    With num_workers > 1, pages are fanned out to a process pool. At most
+    two pages per worker are in flight, so finished pages do not pile up in
+    this process ahead of a slow consumer.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    workers = min(num_workers, os.cpu_count() or 1, doc.page_count)
+    
+    if workers > 1:
+        n_pages = doc.page_count
+        doc.close()
+        page_nums = iter(range(n_pages))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(pdf_bytes,)) as ex:
+            # Unlike ex.map, which submits every page at once, keep a
+            # bounded window and top it up as each page is handed on
+            pending = deque(ex.submit(_process_page, page_num, want_style)
+                            for page_num in islice(page_nums, 2 * workers))
+            while pending:
+                result = pending.popleft().result()
+                for page_num in islice(page_nums, 1):
+                    pending.append(ex.submit(_process_page, page_num, want_style))
+                yield result
+    else:
+        try:
+            for page_num, page in enumerate(doc):
+                yield _extract_page(page, page_num, want_style)
+        finally:
+            doc.close()
+
+
+def _match_title_fields(page_text: str, remaining: Dict, drawing_info: Dict) -> None:
+    """
+    Search one page's text for the title block fields still in remaining,
+    dropping each from remaining once it is found. Pages are searched in
+    order, so a title block on the first page ends the search there.
+    Elements are not searched one by one: labels and values
+    ("DWG" / "533399-5") are often separate elements.
+    """
+    for key, pattern in list(remaining.items()):
+        match = pattern.search(page_text)
         if match:
-            results['drawing_info'][key] = match.group(1)
+            drawing_info[key] = match.group(1)
+            del remaining[key]
+
+
+def extract_drawing_elements(pdf_bytes: bytes, num_workers: int = 1,
+                             want_style: bool = True) -> Dict[str, Any]:
+    """
+    Extract all text elements, markers, and drawing metadata from PDF.
+    With num_workers > 1, pages are fanned out to a process pool.
+    want_style=False skips font/size extraction for a faster word-level pass.
+    """
+    results = {
+        "metadata": [],
+        "pages": [],
+        "markers": {},
+        "all_text_elements": [],
+        "drawing_info": {}
+    }
+    remaining = dict(_TITLE_PATTERNS)
+    
+    # Markers reference their occurrences by index into all_text_elements
+    for page_data, page_markers, page_text in _iter_pages(pdf_bytes, num_workers, want_style):
+        offset = len(results["all_text_elements"])
+        results["pages"].append(page_data)
+        results["all_text_elements"].extend(page_data["elements"])
+        for text, indices in page_markers.items():
+            results["markers"].setdefault(text, []).extend(offset + i for i in indices)
+        if page_text and remaining:
+            _match_title_fields(page_text, remaining, results['drawing_info'])
+    
+    # Page metadata is the page records without their contents
+    results["metadata"] = [
+        {"page": p["page"], "width": p["width"], "height": p["height"], "rotation": p["rotation"]}
+        for p in results["pages"]
+    ]
     
-    doc.close()
     return results
 
 
+def stream_drawing_elements(pdf_bytes: bytes, num_workers: int = 1, want_style: bool = True):
+    """
+    Return an iterator over the extraction as NDJSON lines: one page object
+    (as in "pages") per page, then a final line with "markers",
+    "drawing_info" and "summary". Marker indices count elements across the
+    page lines in order, the same as indices into all_text_elements. Only
+    the current page's elements are held in memory, plus at most two
+    finished pages per worker when the process pool is used.
+    
+    The document is opened and its first page extracted before this
+    returns, so an unreadable PDF raises here and can still be answered
+    with an error status. A failure on a later page is reported as a final
+    {"error": ...} line, since the status is already sent by then.
+    """
+    pages = _iter_pages(pdf_bytes, num_workers, want_style)
+    first = next(pages, None)
+    if first is not None:
+        pages = chain((first,), pages)
+    return _ndjson_lines(pages)
+
+
+def _ndjson_lines(pages) -> Iterator[bytes]:
+    """Encode _iter_pages results as the NDJSON lines of stream_drawing_elements."""
+    markers = {}
+    drawing_info = {}
+    remaining = dict(_TITLE_PATTERNS)
+    n_pages = 0
+    n_elements = 0
+    
+    try:
+        for page_data, page_markers, page_text in pages:
+            for text, indices in page_markers.items():
+                markers.setdefault(text, []).extend(n_elements + i for i in indices)
+            if page_text and remaining:
+                _match_title_fields(page_text, remaining, drawing_info)
+            n_pages += 1
+            n_elements += len(page_data["elements"])
+            yield dumps_json(page_data) + b'\n'
+    except Exception as e:
+        yield dumps_json({'error': str(e)}) + b'\n'
+        return
+    
+    yield dumps_json({
+        'markers': markers,
+        'drawing_info': drawing_info,
+        'summary': {
+            'total_pages': n_pages,
+            'total_markers': len(markers),
+            'total_text_elements': n_elements,
+            'marker_types': list(markers.keys())
+        }
+    }) + b'\n'
+
+
 @app.route('/extract', methods=['POST', 'GET'])
 def extract():
     if request.method == 'GET':
         return jsonify({
             "api": "PDF Drawing Extraction API",
-            "version": "1.0.0",
-            "usage": "POST /extract with {'pdf_base64': '<base64-pdf>'}"
+            "version": "1.2.0",
+            "usage": "POST /extract with a raw application/pdf body or {'pdf_base64': '<base64-pdf>'}",
+            "markers": "Construction markers found (BP1, SC2, etc.), each mapped to its indices in all_text_elements"
         })
     
     try:
-        data = request.get_json()
+        # ?style=false skips font/size extraction for a faster word-level pass
+        want_style = request.args.get('style', 'true').lower() not in ('0', 'false', 'no')
+        
+        # Raw binary PDF (recommended: no base64 inflation or decode)
+        if request.mimetype in ('application/pdf', 'application/octet-stream'):
+            pdf_bytes = request.get_data(cache=False)
+        else:
+            # cache=False so the request does not keep the body and parsed
+            # JSON alive alongside the decoded PDF
+            data = request.get_json(cache=False)
+            
+            if not data or 'pdf_base64' not in data:
+                return jsonify({'error': 'Missing required field: pdf_base64'}), 400
+            
+            pdf_bytes = base64.b64decode(data.pop('pdf_base64'))
+            del data
+        
+        if not pdf_bytes:
+            return jsonify({'error': 'Empty PDF data received'}), 400
         
-        if not data or 'pdf_base64' not in data:
-            return jsonify({'error': 'Missing required field: pdf_base64'}), 400
+        # Accept: application/x-ndjson streams one line per page instead
+        # of building the whole response in memory
+        if request.accept_mimetypes.best == 'application/x-ndjson':
+            return Response(stream_drawing_elements(pdf_bytes, num_workers=NUM_WORKERS,
+                                                    want_style=want_style),
+                            mimetype='application/x-ndjson')
         
-        pdf_bytes = base64.b64decode(data['pdf_base64'])
-        results = extract_drawing_elements(pdf_bytes)
+        results = extract_drawing_elements(pdf_bytes, num_workers=NUM_WORKERS,
+                                           want_style=want_style)
         
         results['summary'] = {
             'total_pages': len(results['metadata']),
@@ -200,7 +445,7 @@ def extract():
             'marker_types': list(results['markers'].keys())
         }
         
-        return jsonify(results)
+        return json_response(results)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -211,7 +456,7 @@ def health():
     return jsonify({
         "status": "healthy",
         "service": "quantity-take-off-api",
-        "version": "1.0.0"
+        "version": "1.2.0"
     })
 
 
@@ -229,5 +474,7 @@ def index():
 if __name__ == '__main__':
     print("Starting local development server...")
     print("API available at: http://localhost:5000/extract")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # PyMuPDF is not thread-safe, so handle one request at a time. For
+    # concurrent requests run under gunicorn instead (see README).
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=False)
 
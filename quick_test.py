@@ -39,8 +39,9 @@ print(f"Markers found: {data['summary']['total_markers']}")
 print(f"Total text elements: {data['summary']['total_text_elements']}")
 
 print("\nMarkers detected:")
-for marker, locs in data['markers'].items():
-    for loc in locs:
+for marker, indices in data['markers'].items():
+    for idx in indices:
+        loc = data['all_text_elements'][idx]
         print(f"  {marker}: page {loc['page']}, position ({loc['x']:.1f}, {loc['y']:.1f})")
 
 print("\nDrawing info:", data.get('drawing_info', 'None extracted'))